@@ -1,11 +1,35 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 import pandas as pd
 import os
+import functools
+import orjson
 from flasgger import Swagger
 import numpy as np
 
+# Opções do orjson: chaves ordenadas (como o jsonify) e suporte a escalares NumPy
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado no orjson, usado pelo jsonify.
+    Serializa direto para bytes e aceita tipos NumPy/pandas sem conversão.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Inicializa a aplicação Flask
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 SWAGGER_CONFIG = {
     'title': 'Catálogo de APIs do Tech Challenge Scrape Books',
@@ -16,28 +40,59 @@ app.config['SWAGGER'] = SWAGGER_CONFIG
 # Configura o Flasgger (Swagger)
 swagger = Swagger(app)
 
-# Define o caminho para o arquivo CSV
+# Define os caminhos dos arquivos de dados: o Parquet gerado pelo scraper é
+# preferido (leitura colunar/binária); o CSV é usado caso ele não exista
 DATA_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'books_data.csv'))
+PARQUET_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'books_data.parquet'))
 
-def load_books_data():
+# Corpos JSON já serializados dos endpoints estáticos, indexados por rota.
+# É preenchido (ou substituído) a cada carregamento dos dados.
+_JSON_CACHE = {}
+
+# Índices auxiliares derivados da base (registros por posição, textos para
+# busca, preços ordenados), também reconstruídos a cada carregamento dos dados.
+# Os endpoints consultam apenas essas listas/arrays, sem operações do pandas.
+_INDEXES = {}
+
+def get_books_df():
     """
-    Carrega os dados do arquivo CSV, adiciona um 'id' e limpa/converte 
-    as colunas 'price' e 'rating' para valores numéricos.
+    Retorna o DataFrame de livros mantido em cache.
+    O arquivo só é lido novamente quando sua data de modificação muda.
     """
+    path = PARQUET_FILE_PATH if os.path.exists(PARQUET_FILE_PATH) else DATA_FILE_PATH
     try:
-        if not os.path.exists(DATA_FILE_PATH):
-            return None
-            
-        df = pd.read_csv(DATA_FILE_PATH)
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return load_books_data(path, mtime)
+
+@functools.lru_cache(maxsize=1)
+def load_books_data(path, mtime):
+    """
+    Carrega os dados do arquivo Parquet ou CSV, adiciona um 'id' e
+    limpa/converte as colunas 'price' e 'rating' para valores numéricos.
+    O resultado é memorizado por 'path' e 'mtime' (use get_books_df()) e
+    não deve ser modificado pelos endpoints.
+    """
+    try:
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path)
+        else:
+            # O engine 'pyarrow' faz o parse em C++ e com múltiplas threads
+            df = pd.read_csv(path, engine='pyarrow')
         
         # 1. Adiciona ID
         df.reset_index(inplace=True)
         df.rename(columns={'index': 'id'}, inplace=True)
         
         # 2. Limpa e converte 'price'
-        # Remove o símbolo '£' e converte para float
+        # Remove o símbolo '£' (e o 'Â' de CSVs com encoding incorreto) e converte
+        # para float; valores inválidos viram NaN em vez de derrubar a carga
         if 'price' in df.columns:
-            df['price_numeric'] = df['price'].replace({r'[£]': ''}, regex=True).astype(float)
+            df['price_numeric'] = pd.to_numeric(
+                df['price'].str.replace('£', '', regex=False).str.replace('Â', '', regex=False),
+                errors='coerce'
+            )
         
         # 3. Limpa e converte 'rating'
         # Mapeia o texto da avaliação (ex: "Five") para um número (ex: 5)
@@ -49,15 +104,132 @@ def load_books_data():
                 "Four": 4,
                 "Five": 5
             }
-            # Extrai a primeira palavra (ex: "Five") e a mapeia
-            df['rating_numeric'] = df['rating'].str.split(' ').str[0].map(rating_map)
+            # Extrai a primeira palavra (ex: "Five") e a mapeia; sem avaliações
+            # inválidas (NaN), a coluna é reduzida para int8
+            df['rating_numeric'] = pd.to_numeric(
+                df['rating'].str.partition(' ')[0].map(rating_map),
+                downcast='integer'
+            )
+        
+        # 4. Converte 'category' para o tipo categórico: cada linha guarda
+        # apenas um código inteiro, usado no agrupamento e na busca
+        df['category'] = df['category'].astype('category')
+        
+        # 5. Monta os índices usados nas consultas por ID, busca e faixa de preço
+        build_indexes(df)
+        
+        # 6. Serializa as respostas dos endpoints estáticos
+        build_json_cache(df)
             
         return df
         
     except Exception as e:
-        print(f"Erro ao carregar ou processar o arquivo CSV: {e}")
+        print(f"Erro ao carregar ou processar o arquivo de dados: {e}")
         return None
 
+def compute_stats_overview(df):
+    """Calcula as estatísticas gerais da coleção."""
+    total_books = len(df)
+    average_price = round(df['price_numeric'].mean(), 2)
+    
+    # Conta a ocorrência de cada avaliação (1 a 5)
+    rating_dist = df['rating_numeric'].value_counts().sort_index()
+    # Converte para um formato JSON amigável
+    rating_distribution = {str(k): v for k, v in rating_dist.items()}
+    
+    return {
+        "total_books": total_books,
+        "average_price": average_price,
+        "rating_distribution": rating_distribution
+    }
+
+def compute_category_stats(df):
+    """
+    Calcula a quantidade de livros e o preço médio de cada categoria.
+    As somas por grupo usam os códigos inteiros da coluna categórica com
+    np.bincount, em uma única passada e sem o groupby do pandas.
+    """
+    # Códigos 0..n-1 por categoria, em ordem alfabética (como o groupby);
+    # categorias ausentes têm código -1 e são descartadas
+    codes = df['category'].cat.codes.to_numpy()
+    categories = df['category'].cat.categories
+    prices = df['price_numeric'].to_numpy()
+    n_groups = len(categories)
+    
+    valid = codes >= 0
+    book_count = np.bincount(codes[valid], minlength=n_groups)
+    
+    # A média ignora preços inválidos (NaN), assim como o pandas
+    priced = valid & ~np.isnan(prices)
+    price_sum = np.bincount(codes[priced], weights=prices[priced], minlength=n_groups)
+    price_count = np.bincount(codes[priced], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average_price = np.round(price_sum / price_count, 2)
+    
+    return [
+        {"category": category, "book_count": count, "average_price": price}
+        for category, count, price in zip(
+            categories.tolist(), book_count.tolist(), average_price.tolist()
+        )
+    ]
+
+def build_json_cache(df):
+    """
+    Serializa uma única vez as respostas dos endpoints que dependem apenas
+    da base de dados (listagem, categorias, estatísticas e top-rated).
+    """
+    payloads = {
+        'categories': {"categories": df['category'].unique().tolist()},
+        'stats_overview': compute_stats_overview(df),
+        'stats_categories': compute_category_stats(df),
+    }
+    bodies = {
+        key: orjson.dumps(payload, option=ORJSON_OPTIONS)
+        for key, payload in payloads.items()
+    }
+    # As listas de livros reaproveitam os registros já serializados
+    bodies['books'] = json_array_body(range(len(df)))
+    # Livros onde 'rating_numeric' é 5
+    bodies['top_rated'] = json_array_body(np.flatnonzero(df['rating_numeric'].to_numpy() == 5))
+    _JSON_CACHE.update(bodies)
+
+def build_indexes(df):
+    """
+    Monta as estruturas auxiliares das consultas:
+    - 'record_bodies': cada livro já serializado em JSON (bytes), onde a
+      posição na lista é o 'id';
+    - 'titles_lc': títulos em minúsculas (array NumPy de strings) para a busca;
+    - 'category_codes'/'category_names_lc': código da categoria de cada livro
+      e os nomes das categorias distintas em minúsculas, para que a busca por
+      categoria compare o texto só uma vez por categoria;
+    - 'price_order'/'sorted_prices': preços ordenados uma única vez, permitindo
+      localizar uma faixa de preço por busca binária (np.searchsorted).
+    """
+    order = np.argsort(df['price_numeric'].to_numpy(), kind='stable')
+    _INDEXES.update({
+        'record_bodies': [
+            orjson.dumps(record, option=ORJSON_OPTIONS)
+            for record in df.to_dict(orient='records')
+        ],
+        'titles_lc': np.array(df['title'].fillna('').str.lower(), dtype=str),
+        'category_codes': df['category'].cat.codes.to_numpy(),
+        'category_names_lc': np.array(df['category'].cat.categories.str.lower(), dtype=str),
+        'price_order': order,
+        'sorted_prices': df['price_numeric'].to_numpy()[order],
+    })
+
+def json_array_body(positions):
+    """
+    Monta o corpo JSON de uma lista de livros concatenando os registros já
+    serializados, sem criar dicts nem serializar novamente a cada requisição.
+    """
+    bodies = _INDEXES['record_bodies']
+    return b'[' + b','.join([bodies[i] for i in positions]) + b']'
+
+def json_body_response(body, status=200):
+    """Cria uma resposta HTTP a partir de um corpo JSON já serializado."""
+    return Response(body, status=status, mimetype='application/json')
+
 @app.route('/', methods=['GET'])
 def index():
     """
@@ -115,10 +287,10 @@ def get_all_books():
       503:
         description: Erro ao carregar a base de dados.
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada ou indisponível."}), 503
-    return jsonify(df_books.to_dict(orient='records')), 200
+    return json_body_response(_JSON_CACHE['books'])
 
 @app.route('/api/v1/books/<int:book_id>', methods=['GET'])
 def get_book_by_id(book_id):
@@ -139,13 +311,14 @@ def get_book_by_id(book_id):
       404:
         description: Livro não encontrado.
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
-    book = df_books[df_books['id'] == book_id]
-    if book.empty:
+    # O 'id' é a posição do livro na base, então a busca é direta
+    bodies = _INDEXES['record_bodies']
+    if not 0 <= book_id < len(bodies):
         return jsonify({"error": f"Livro com ID {book_id} não encontrado."}), 404
-    return jsonify(book.to_dict(orient='records')[0]), 200
+    return json_body_response(bodies[book_id])
 
 @app.route('/api/v1/books/search', methods=['GET'])
 def search_books():
@@ -171,7 +344,7 @@ def search_books():
       400:
         description: Nenhum parâmetro de busca fornecido.
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
     
@@ -181,15 +354,21 @@ def search_books():
     if not query_title and not query_category:
         return jsonify({"error": "Forneça 'title' ou 'category' como parâmetro."}), 400
         
-    results = df_books.copy()
+    # Combina os filtros em uma única máscara e só então extrai as posições
+    # (ids) dos livros encontrados
+    mask = np.ones(len(_INDEXES['record_bodies']), dtype=bool)
     if query_title:
-        results = results[results['title'].str.contains(query_title, case=False, na=False)]
+        mask &= np.strings.find(_INDEXES['titles_lc'], query_title.lower()) >= 0
     if query_category:
-        results = results[results['category'].str.contains(query_category, case=False, na=False)]
+        # Testa o texto contra cada categoria distinta e propaga o resultado
+        # aos livros pelos códigos (o False extra cobre o código -1, sem categoria)
+        matched = np.strings.find(_INDEXES['category_names_lc'], query_category.lower()) >= 0
+        mask &= np.append(matched, False)[_INDEXES['category_codes']]
+    positions = np.flatnonzero(mask)
         
-    if results.empty:
+    if positions.size == 0:
         return jsonify({"message": "Nenhum livro encontrado."}), 404
-    return jsonify(results.to_dict(orient='records')), 200
+    return json_body_response(json_array_body(positions))
 
 @app.route('/api/v1/categories', methods=['GET'])
 def get_all_categories():
@@ -202,11 +381,10 @@ def get_all_categories():
       200:
         description: Uma lista de todas as categorias únicas.
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
-    unique_categories = df_books['category'].unique().tolist()
-    return jsonify({"categories": unique_categories}), 200
+    return json_body_response(_JSON_CACHE['categories'])
 
 # --- Endpoints Opcionais (Bônus) ---
 
@@ -233,26 +411,12 @@ def get_stats_overview():
               type: object
               example: {"1": 200, "2": 196, "3": 203, "4": 197, "5": 204}
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
         
-    try:
-        total_books = int(len(df_books))
-        average_price = round(df_books['price_numeric'].mean(), 2)
-        
-        # Conta a ocorrência de cada avaliação (1 a 5)
-        rating_dist = df_books['rating_numeric'].value_counts().sort_index()
-        # Converte para um formato JSON amigável
-        rating_distribution = {str(k): int(v) for k, v in rating_dist.items()}
-        
-        return jsonify({
-            "total_books": total_books,
-            "average_price": average_price,
-            "rating_distribution": rating_distribution
-        }), 200
-    except Exception as e:
-        return jsonify({"error": f"Erro ao calcular estatísticas: {e}"}), 500
+    # As estatísticas são calculadas uma única vez, no carregamento dos dados
+    return json_body_response(_JSON_CACHE['stats_overview'])
 
 @app.route('/api/v1/stats/categories', methods=['GET'])
 def get_stats_by_category():
@@ -276,23 +440,12 @@ def get_stats_by_category():
               average_price:
                 type: number
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
         
-    try:
-        # Agrupa por categoria e calcula a contagem e a média de preço
-        stats = df_books.groupby('category').agg(
-            book_count=('id', 'count'),
-            average_price=('price_numeric', 'mean')
-        ).reset_index()
-        
-        # Arredonda a média de preço
-        stats['average_price'] = stats['average_price'].round(2)
-        
-        return jsonify(stats.to_dict(orient='records')), 200
-    except Exception as e:
-        return jsonify({"error": f"Erro ao calcular estatísticas por categoria: {e}"}), 500
+    # As estatísticas são calculadas uma única vez, no carregamento dos dados
+    return json_body_response(_JSON_CACHE['stats_categories'])
 
 @app.route('/api/v1/books/top-rated', methods=['GET'])
 def get_top_rated_books():
@@ -305,20 +458,16 @@ def get_top_rated_books():
       200:
         description: Uma lista de livros com avaliação máxima (5 estrelas).
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
         
-    try:
-        # Filtra livros onde 'rating_numeric' é 5
-        top_rated_books = df_books[df_books['rating_numeric'] == 5]
-        
-        if top_rated_books.empty:
-            return jsonify({"message": "Nenhum livro com 5 estrelas encontrado."}), 404
-            
-        return jsonify(top_rated_books.to_dict(orient='records')), 200
-    except Exception as e:
-        return jsonify({"error": f"Erro ao buscar livros top-rated: {e}"}), 500
+    # A lista é filtrada e serializada no carregamento dos dados
+    body = _JSON_CACHE['top_rated']
+    if body == b'[]':
+        return jsonify({"message": "Nenhum livro com 5 estrelas encontrado."}), 404
+
+    return json_body_response(body)
 
 @app.route('/api/v1/books/price-range', methods=['GET'])
 def get_books_by_price_range():
@@ -346,7 +495,7 @@ def get_books_by_price_range():
       400:
         description: Parâmetros de preço inválidos.
     """
-    df_books = load_books_data()
+    df_books = get_books_df()
     if df_books is None:
         return jsonify({"error": "Base de dados não encontrada."}), 503
 
@@ -365,16 +514,17 @@ def get_books_by_price_range():
         return jsonify({"error": "O preço 'min' não pode ser maior que o 'max'."}), 400
 
     try:
-        # Filtra o DataFrame
-        results = df_books[
-            (df_books['price_numeric'] >= min_price) &
-            (df_books['price_numeric'] <= max_price)
-        ]
+        # Localiza a faixa no índice de preços ordenados e devolve as
+        # posições na ordem original (por 'id')
+        sorted_prices = _INDEXES['sorted_prices']
+        lo = np.searchsorted(sorted_prices, min_price, side='left')
+        hi = np.searchsorted(sorted_prices, max_price, side='right')
+        positions = np.sort(_INDEXES['price_order'][lo:hi])
 
-        if results.empty:
+        if positions.size == 0:
             return jsonify({"message": "Nenhum livro encontrado nesta faixa de preço."}), 404
             
-        return jsonify(results.to_dict(orient='records')), 200
+        return json_body_response(json_array_body(positions))
     except Exception as e:
         return jsonify({"error": f"Erro ao filtrar por preço: {e}"}), 500
 
@@ -0,0 +1,13 @@
+# Configuração do gunicorn, lida automaticamente ao executar `gunicorn wsgi:app`
+# a partir da raiz do projeto. O endereço padrão é 127.0.0.1:8000 (ou
+# 0.0.0.0:$PORT, se a variável PORT estiver definida).
+import multiprocessing
+
+# Carrega a aplicação (e a base de livros) no processo principal antes de
+# criar os workers, que passam a compartilhar essa memória
+preload_app = True
+
+# Um processo por CPU, cada um atendendo requisições em várias threads
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = 4
@@ -1,17 +1,39 @@
-import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
 import pandas as pd
 import os
 
-def get_book_details(book_url):
+# Número máximo de páginas de detalhes baixadas simultaneamente
+MAX_CONCURRENCY = 16
+
+def create_client():
+    """
+    Cria um cliente HTTP assíncrono, reaproveitado por todas as requisições.
+    Com HTTP/2 as páginas são multiplexadas em poucas conexões TCP/TLS
+    (se o servidor não suportar, o httpx usa HTTP/1.1).
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        timeout=30.0,
+        follow_redirects=True
+    )
+
+async def get_book_details(client, book_url, semaphore=None):
     """
     Extrai os detalhes de um único livro a partir da sua URL.
     Dados a serem capturados: título, preço, rating, disponibilidade, categoria, imagem[cite: 52].
+    Se 'semaphore' for informado, ele limita quantas páginas são baixadas ao mesmo tempo.
     """
     try:
-        response = requests.get(book_url)
+        if semaphore is None:
+            response = await client.get(book_url)
+        else:
+            async with semaphore:
+                response = await client.get(book_url)
         response.raise_for_status()  # Verifica se a requisição foi bem-sucedida
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
 
         # Extrai os dados
         title = soup.find('h1').text
@@ -41,48 +63,53 @@ def get_book_details(book_url):
             'image_url': image_url,
             'book_url': book_url
         }
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Erro ao acessar {book_url}: {e}")
         return None
     except Exception as e:
         print(f"Erro ao processar dados de {book_url}: {e}")
         return None
 
-def scrape_all_books():
+async def scrape_all_books():
     """
     Navega por todas as páginas do site para extrair dados de todos os livros.
+    Primeiro percorre a paginação coletando os links dos livros e depois
+    baixa as páginas de detalhes de forma concorrente.
     """
     base_url = 'https://books.toscrape.com/catalogue/'
     current_page_url = base_url + 'page-1.html'
-    all_books_data = []
-
-    while current_page_url:
-        print(f"Coletando dados da página: {current_page_url}")
+    book_links = []
+    async with create_client() as client:
+        while current_page_url:
+            print(f"Coletando dados da página: {current_page_url}")
         
-        try:
-            response = requests.get(current_page_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Encontra todos os links de livros na página atual
-            book_links = [base_url + a['href'] for a in soup.select('h3 > a')]
-
-            for link in book_links:
-                book_data = get_book_details(link)
-                if book_data:
-                    all_books_data.append(book_data)
-
-            # Encontra o link para a próxima página
-            next_page_element = soup.find('li', class_='next')
-            if next_page_element:
-                next_page_url = next_page_element.find('a')['href']
-                current_page_url = base_url + next_page_url
-            else:
-                current_page_url = None # Fim da paginação
-
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao acessar a página de listagem {current_page_url}: {e}")
-            break # Interrompe o loop em caso de erro de rede
+            try:
+                response = await client.get(current_page_url)
+                response.raise_for_status()
+                soup = BeautifulSoup(response.content, 'lxml')
+
+                # Encontra todos os links de livros na página atual
+                book_links.extend(base_url + a['href'] for a in soup.select('h3 > a'))
+
+                # Encontra o link para a próxima página
+                next_page_element = soup.find('li', class_='next')
+                if next_page_element:
+                    next_page_url = next_page_element.find('a')['href']
+                    current_page_url = base_url + next_page_url
+                else:
+                    current_page_url = None # Fim da paginação
+
+            except httpx.HTTPError as e:
+                print(f"Erro ao acessar a página de listagem {current_page_url}: {e}")
+                break # Interrompe o loop em caso de erro de rede
+
+        print(f"Coletando detalhes de {len(book_links)} livros...")
+        # asyncio.gather preserva a ordem dos links, mantendo a ordem do catálogo
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        results = await asyncio.gather(
+            *(get_book_details(client, link, semaphore) for link in book_links)
+        )
+        all_books_data = [book_data for book_data in results if book_data]
 
     return all_books_data
 
@@ -103,10 +130,29 @@ def save_to_csv(data, filename='../data/books_data.csv'):
     df.to_csv(filename, index=False, encoding='utf-8')
     print(f"Dados salvos com sucesso em '{filename}'!")
 
+def save_to_parquet(data, filename='../data/books_data.parquet'):
+    """
+    Salva os dados coletados em um arquivo Parquet (compressão zstd), formato
+    colunar lido diretamente pela API, sem o parse de texto do CSV.
+    O caminho é relativo à localização do script.
+    """
+    if not data:
+        print("Nenhum dado para salvar.")
+        return
+
+    df = pd.DataFrame(data)
+    
+    # Garante que o diretório de dados exista
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    
+    df.to_parquet(filename, index=False, compression='zstd')
+    print(f"Dados salvos com sucesso em '{filename}'!")
+
 
 if __name__ == '__main__':
     print("Iniciando o processo de Web Scraping...")
-    scraped_data = scrape_all_books()
+    scraped_data = asyncio.run(scrape_all_books())
     if scraped_data:
         save_to_csv(scraped_data)
+        save_to_parquet(scraped_data)
     print("Processo de Web Scraping finalizado.")
\ No newline at end of file
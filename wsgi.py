@@ -0,0 +1,13 @@
+"""
+Ponto de entrada WSGI para execução em produção com o gunicorn:
+
+    gunicorn wsgi:app
+
+As configurações (workers, threads e preload) ficam em gunicorn.conf.py.
+"""
+from api.app import app, get_books_df
+
+# Carrega a base e pré-serializa as respostas já na importação: com o
+# preload do gunicorn isso ocorre uma única vez no processo principal e os
+# workers herdam (via fork) a memória já preenchida
+get_books_df()